@@ -1,50 +1,394 @@
-from flask import Flask, request, render_template_string, send_file, redirect, url_for
+from flask import Flask, request, send_file, redirect, url_for, jsonify, g
+import csv
+import functools
+import glob
+import hashlib
+import itertools
+import secrets
 import sqlite3
+import tempfile
+import threading
+import numpy as np
 import pandas as pd
+import xlsxwriter
+from werkzeug.exceptions import RequestedRangeNotSatisfiable
+from markupsafe import Markup
 import os
 
+try:
+    from numba import njit, prange
+except ImportError:  # optional; the NumPy kernel below is used instead
+    njit = None
+
+try:
+    import fcntl
+except ImportError:  # Windows; no preforking server there, so nothing to guard
+    fcntl = None
+
+try:
+    import pyarrow as pa
+    from pyarrow import feather
+except ImportError:  # optional; without it there is no on-disk snapshot
+    pa = None
+
 app = Flask(__name__)
 
 # ---------------- CONFIG ----------------
 BASE_DIR = os.path.dirname(os.path.abspath(__file__))
 DB_PATH = os.path.join(BASE_DIR, "payroll.db")
-EXPORT_FILE = os.path.join(BASE_DIR, "payroll_export.xlsx")
+# Base names: exports are written as payroll_export.<staff version>.<ext>.
+EXPORT_XLSX_BASE = os.path.join(BASE_DIR, "payroll_export.xlsx")
+EXPORT_CSV_BASE = os.path.join(BASE_DIR, "payroll_export.csv")
+PAYROLL_SNAPSHOT = os.path.join(BASE_DIR, "payroll_cache.arrow")
+INIT_LOCK = DB_PATH + ".init.lock"
+DEFAULT_TOP = 50
+SALARY_FIELDS = ("basic", "housing", "transport", "feeding")
+
+# ---------------- CACHE ----------------
+# Keyed on staff_version(), which identifies the database and moves on every
+# write to staff; compute_payroll() only rebuilds when it changes.
+_PAYROLL_CACHE = {"version": None, "df": None}
+_HTML_CACHE = {"version": None, "top": None, "rows": 0, "html": ""}
+_STATS_CACHE = {"version": None, "stats": (0, 0)}
+_PAYROLL_LOCK = threading.RLock()
 
 # ---------------- DATABASE ----------------
+NET_EXPR = "(basic + housing + transport + feeding) * 0.82"
+
 def get_db():
-    conn = sqlite3.connect(DB_PATH)
-    conn.row_factory = sqlite3.Row
-    return conn
+    # One connection per app context, shared by compute_payroll and the insert path.
+    if "db" not in g:
+        # Autocommit mode: every write path opens its transaction explicitly.
+        g.db = sqlite3.connect(DB_PATH, check_same_thread=False, isolation_level=None)
+        g.db.row_factory = sqlite3.Row
+        # Per-connection settings; journal_mode=WAL is persisted by init_db().
+        g.db.execute("PRAGMA synchronous=NORMAL")
+        g.db.execute("PRAGMA temp_store=MEMORY")
+        g.db.execute("PRAGMA cache_size=-20000")
+        # Reads go through a 256 MB memory map instead of read() syscalls.
+        g.db.execute("PRAGMA mmap_size=268435456")
+    return g.db
+
+@app.teardown_appcontext
+def close_db(exc):
+    conn = g.pop("db", None)
+    if conn is not None:
+        conn.close()
 
 def init_db():
-    with get_db() as conn:
-        conn.execute("""
-        CREATE TABLE IF NOT EXISTS staff (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            name TEXT NOT NULL,
-            role TEXT NOT NULL,
-            basic REAL NOT NULL,
-            housing REAL NOT NULL,
-            transport REAL NOT NULL,
-            feeding REAL NOT NULL,
-            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-        )
-        """)
+    # Every gunicorn worker imports wsgi.py and calls this; the file lock keeps
+    # schema creation and migration to one worker at a time.
+    with open(INIT_LOCK, "w") as lock:
+        if fcntl is not None:
+            fcntl.flock(lock, fcntl.LOCK_EX)
+
+        with app.app_context(), get_db() as conn:
+            # page_size only takes effect on a fresh database, before the first
+            # write and before switching to WAL.
+            conn.execute("PRAGMA page_size=8192")
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute(f"""
+            CREATE TABLE IF NOT EXISTS staff (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                name TEXT NOT NULL,
+                role TEXT NOT NULL,
+                basic REAL NOT NULL,
+                housing REAL NOT NULL,
+                transport REAL NOT NULL,
+                feeding REAL NOT NULL,
+                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                net REAL GENERATED ALWAYS AS ({NET_EXPR}) VIRTUAL
+            )
+            """)
+
+            # Databases created before `net` existed: VIRTUAL columns can be added in place.
+            columns = {row["name"] for row in conn.execute("PRAGMA table_xinfo(staff)")}
+            if "net" not in columns:
+                conn.execute(f"ALTER TABLE staff ADD COLUMN net REAL GENERATED ALWAYS AS ({NET_EXPR}) VIRTUAL")
+
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_staff_net ON staff(net DESC)")
+
+            # Cache key for everything derived from staff (see staff_version()):
+            # a random id minted with the database, a counter that triggers bump on
+            # UPDATE/DELETE, and MAX(id). Inserts are covered by MAX(id), which
+            # AUTOINCREMENT only ever raises, so bulk ingest pays no per-row trigger;
+            # writers outside this app and a recreated database still invalidate.
+            conn.execute("""
+            CREATE TABLE IF NOT EXISTS payroll_meta (
+                id INTEGER PRIMARY KEY CHECK (id = 1),
+                db_id TEXT NOT NULL,
+                version INTEGER NOT NULL DEFAULT 0
+            )
+            """)
+            conn.execute("INSERT OR IGNORE INTO payroll_meta (id, db_id) VALUES (1, ?)",
+                         (secrets.token_hex(8),))
+            conn.execute("DROP TRIGGER IF EXISTS staff_version_insert")
+            for event in ("UPDATE", "DELETE"):
+                conn.execute(f"""
+                CREATE TRIGGER IF NOT EXISTS staff_version_{event.lower()}
+                AFTER {event} ON staff
+                BEGIN
+                    UPDATE payroll_meta SET version = version + 1;
+                END
+                """)
+
+            _discard_stale_snapshot(staff_version(conn))
+
+    _warm_payroll_kernel()
 
 # ---------------- PAYROLL LOGIC ----------------
-def compute_payroll():
-    with get_db() as conn:
-        df = pd.read_sql_query("SELECT * FROM staff", conn)
+PAYROLL_SQL = """
+SELECT name, role, basic, housing, transport, feeding,
+       (basic + housing + transport + feeding) AS gross,
+       (basic + housing + transport + feeding) * 0.10 AS tax,
+       (basic + housing + transport + feeding) * 0.08 AS pension,
+       net
+FROM staff
+ORDER BY net DESC
+"""
 
-    if df.empty:
-        return df
+STAFF_SQL = """
+SELECT name, role, basic, housing, transport, feeding
+FROM staff
+ORDER BY net DESC
+"""
 
-    df["gross"] = df[["basic", "housing", "transport", "feeding"]].sum(axis=1)
-    df["tax"] = df["gross"] * 0.10
-    df["pension"] = df["gross"] * 0.08
-    df["net"] = df["gross"] - (df["tax"] + df["pension"])
+if njit is not None:
+    @njit(parallel=True, fastmath=True, cache=True)
+    def _payroll_kernel(b, h, t, f, gross, tax, pension, net):
+        for i in prange(b.shape[0]):
+            gross_i = b[i] + h[i] + t[i] + f[i]
+            gross[i] = gross_i
+            tax[i] = gross_i * 0.10
+            pension[i] = gross_i * 0.08
+            net[i] = gross_i * 0.82
+else:
+    def _payroll_kernel(b, h, t, f, gross, tax, pension, net):
+        np.add(b, h, out=gross)
+        gross += t
+        gross += f
+        np.multiply(gross, 0.10, out=tax)
+        np.multiply(gross, 0.08, out=pension)
+        np.multiply(gross, 0.82, out=net)
+
+def _warm_payroll_kernel():
+    # Trigger JIT compilation at startup instead of on the first dashboard hit.
+    ones = np.ones(2, np.float64)
+    _payroll_kernel(ones, ones, ones, ones, *(np.empty(2, np.float64) for _ in range(4)))
+
+def _build_payroll():
+    # Rows come back pre-sorted by walking idx_staff_net. The derived columns are
+    # filled by one fused kernel over contiguous float64 buffers rather than
+    # through per-column pandas arithmetic.
+    df = pd.read_sql_query(STAFF_SQL, get_db())
+    b, h, t, f = (np.ascontiguousarray(df[c].to_numpy(dtype=np.float64))
+                  for c in SALARY_FIELDS)
+    gross, tax, pension, net = (np.empty(len(df), np.float64) for _ in range(4))
+    _payroll_kernel(b, h, t, f, gross, tax, pension, net)
+    df["gross"] = gross
+    df["tax"] = tax
+    df["pension"] = pension
+    df["net"] = net
+    return df
+
+def payroll_stats():
+    # Derived from the payroll frame's float64 buffers when it is rebuilt and
+    # cached alongside it, so a dashboard hit is a dict lookup rather than an
+    # aggregate scan of staff.
+    with _PAYROLL_LOCK:
+        if _STATS_CACHE["version"] != staff_version():
+            df = compute_payroll()
+            if df.empty:
+                stats = (0, 0)
+            else:
+                gross = df["gross"].to_numpy(dtype=np.float64, copy=False)
+                net = df["net"].to_numpy(dtype=np.float64, copy=False)
+                stats = (round(float(gross.mean()), 2), int(np.count_nonzero(net > 30000)))
+            _STATS_CACHE["stats"] = stats
+            _STATS_CACHE["version"] = _PAYROLL_CACHE["version"]
+        return _STATS_CACHE["stats"]
+
+def staff_version(conn=None):
+    # MAX(id) on the rowid is a single B-tree seek, not a scan.
+    db_id, version, last_id = (conn or get_db()).execute(
+        "SELECT db_id, version, (SELECT MAX(id) FROM staff) FROM payroll_meta"
+    ).fetchone()
+    return f"{db_id}-{version}-{last_id or 0}"
+
+def _snapshot_version(reader):
+    return (reader.schema.metadata or {}).get(b"staff_version", b"").decode()
+
+def _read_snapshot(version):
+    if pa is None:
+        return None
+    try:
+        with pa.memory_map(PAYROLL_SNAPSHOT) as source:
+            reader = pa.ipc.open_file(source)
+            if _snapshot_version(reader) != version:
+                return None
+            return reader.read_all().to_pandas()
+    except (FileNotFoundError, pa.ArrowInvalid):
+        return None
+
+def _discard_stale_snapshot(version):
+    if pa is None:
+        return
+    try:
+        with pa.memory_map(PAYROLL_SNAPSHOT) as source:
+            stale = _snapshot_version(pa.ipc.open_file(source)) != version
+    except FileNotFoundError:
+        return
+    except pa.ArrowInvalid:
+        stale = True
+    if stale:
+        try:
+            os.remove(PAYROLL_SNAPSHOT)
+        except FileNotFoundError:
+            pass
+
+def _write_snapshot(df, version):
+    if pa is None:
+        return
+    table = pa.Table.from_pandas(df, preserve_index=False)
+    table = table.replace_schema_metadata(
+        {**(table.schema.metadata or {}), b"staff_version": version.encode()}
+    )
+    # Uncompressed so readers can memory-map it; written aside and renamed so a
+    # concurrent reader never sees a partial file.
+    tmp = f"{PAYROLL_SNAPSHOT}.{os.getpid()}.tmp"
+    feather.write_feather(table, tmp, compression="uncompressed")
+    os.replace(tmp, PAYROLL_SNAPSHOT)
 
-    return df.sort_values("net", ascending=False)
+def compute_payroll():
+    with _PAYROLL_LOCK:
+        version = staff_version()
+        if _PAYROLL_CACHE["version"] == version and _PAYROLL_CACHE["df"] is not None:
+            return _PAYROLL_CACHE["df"]
+
+        df = _read_snapshot(version)
+        if df is None:
+            # Read the version and the rows from one snapshot of the database.
+            conn = get_db()
+            conn.execute("BEGIN")
+            try:
+                version = staff_version(conn)
+                df = _build_payroll()
+            finally:
+                conn.commit()
+            _write_snapshot(df, version)
+
+        _PAYROLL_CACHE["version"] = version
+        _PAYROLL_CACHE["df"] = df
+        return df
+
+def payroll_table_html(top=DEFAULT_TOP):
+    with _PAYROLL_LOCK:
+        # top is clamped to the row count, so every K >= N shares one cache slot.
+        fresh = _HTML_CACHE["version"] == staff_version()
+        if fresh:
+            top = min(top, _HTML_CACHE["rows"])
+        if not fresh or _HTML_CACHE["top"] != top:
+            df = compute_payroll()
+            rows = len(df)
+            top = min(top, rows)
+            if df.empty:
+                html = "<p>No staff added yet.</p>"
+            else:
+                # The frame is already ordered by net, so the top K rows are a
+                # prefix and only that slice pays for to_html.
+                html = df.head(top).to_html(index=False, classes="table", escape=True,
+                                            float_format=lambda x: f"{x:.2f}")
+                if rows > top:
+                    more = url_for("index", top=min(top + DEFAULT_TOP, rows))
+                    everything = url_for("index", top=rows)
+                    html = (f'<p class="table-note">Showing top {top} of {rows} staff.'
+                            f' <a href="{more}">Show more</a>'
+                            f' <a href="{everything}">Show all</a></p>') + html
+            # Markup tells Jinja the fragment is already escaped (to_html escapes
+            # cell values), so rendering skips the autoescape pass over it.
+            _HTML_CACHE["html"] = Markup(html)
+            _HTML_CACHE["top"] = top
+            _HTML_CACHE["rows"] = rows
+            _HTML_CACHE["version"] = _PAYROLL_CACHE["version"]
+        return _HTML_CACHE["html"]
+
+# A staff record that fails validation; str() is the user-facing message.
+class InvalidStaff(ValueError):
+    pass
+
+def _staff_text(value, field):
+    # name/role are NOT NULL; None, NaN or blank must not be stringified past it.
+    if not isinstance(value, str) or not value.strip():
+        raise InvalidStaff(f"Staff {field} is required.")
+    return value.strip()
+
+def _staff_rows(names, roles, salaries):
+    # salaries is an (n, 4) float64 array. NaN would be stored as NULL in the
+    # NOT NULL salary columns and inf is no salary, so both are rejected like
+    # any other bad number.
+    if not np.isfinite(salaries).all():
+        raise ValueError("non-finite salary")
+    return [(_staff_text(n, "name"), _staff_text(r, "role"), *vals)
+            for n, r, vals in zip(names, roles, salaries.tolist())]
+
+def parse_staff(records):
+    if not all(isinstance(rec, dict) for rec in records):
+        raise InvalidStaff("Each staff record must be an object.")
+    raw = [[rec[k] for k in SALARY_FIELDS] for rec in records]
+    # np.asarray would quietly turn JSON true/false into 1.0/0.0.
+    if any(isinstance(v, bool) for row in raw for v in row):
+        raise ValueError("boolean salary")
+    # All salary fields of all records are coerced in one array conversion.
+    salaries = np.asarray(raw, dtype=np.float64).reshape(-1, len(SALARY_FIELDS))
+    return _staff_rows([rec["name"] for rec in records],
+                       [rec["role"] for rec in records], salaries)
+
+def parse_staff_csv(file):
+    # read_csv coerces the salary columns in C while parsing. name/role stay
+    # verbatim text ("007" is not 7) and blanks stay "" rather than NaN, so
+    # _staff_text() rejects them.
+    df = pd.read_csv(file, keep_default_na=False,
+                     dtype={"name": str, "role": str, **{k: "float64" for k in SALARY_FIELDS}})
+    # Rows with more fields than the header make pandas shift the extras into
+    # an implicit index instead of failing.
+    if not isinstance(df.index, pd.RangeIndex):
+        raise pd.errors.ParserError("row has more fields than the header")
+    for col in ("name", "role", *SALARY_FIELDS):
+        if col not in df.columns:
+            raise KeyError(col)
+    return _staff_rows(df["name"], df["role"],
+                       df[list(SALARY_FIELDS)].to_numpy(dtype=np.float64))
+
+def insert_staff(rows):
+    # One transaction for the whole batch; the new rows raise MAX(id), which
+    # moves staff_version() and invalidates every payroll cache on commit.
+    with get_db() as conn:
+        conn.execute("BEGIN IMMEDIATE")
+        conn.executemany("""
+        INSERT INTO staff (name, role, basic, housing, transport, feeding)
+        VALUES (?, ?, ?, ?, ?, ?)
+        """, rows)
+
+# ---------------- STATIC ----------------
+@functools.lru_cache(maxsize=64)
+def _asset_digest(path, mtime_ns):
+    with open(path, "rb") as fh:
+        return hashlib.sha1(fh.read()).hexdigest()[:12]
+
+def static_url(filename):
+    # Content hash in the query string, so assets can be cached as immutable
+    # and still change URL whenever the file does. The hash is keyed on mtime,
+    # so an edited asset is re-hashed without restarting the process.
+    path = os.path.join(app.static_folder, filename)
+    return url_for("static", filename=filename, v=_asset_digest(path, os.stat(path).st_mtime_ns))
+
+app.jinja_env.globals["static_url"] = static_url
+
+@app.after_request
+def cache_static(response):
+    if request.endpoint == "static":
+        response.headers["Cache-Control"] = "public, max-age=31536000, immutable"
+    return response
 
 # ---------------- ROUTES ----------------
 @app.route("/", methods=["GET", "POST"])
@@ -53,48 +397,154 @@ def index():
 
     if request.method == "POST":
         try:
-            data = {
-                "name": request.form["name"].strip(),
-                "role": request.form["role"].strip(),
-                "basic": float(request.form["basic"]),
-                "housing": float(request.form["housing"]),
-                "transport": float(request.form["transport"]),
-                "feeding": float(request.form["feeding"]),
-            }
-
-            with get_db() as conn:
-                conn.execute("""
-                INSERT INTO staff (name, role, basic, housing, transport, feeding)
-                VALUES (:name, :role, :basic, :housing, :transport, :feeding)
-                """, data)
-
+            insert_staff(parse_staff([request.form]))
             return redirect(url_for("index"))
 
+        except InvalidStaff as e:
+            error = str(e)
         except ValueError:
             error = "Salary fields must be valid numbers."
 
-    df = compute_payroll()
-    avg_gross = round(df["gross"].mean(), 2) if not df.empty else 0
-    above_30k = int((df["net"] > 30000).sum()) if not df.empty else 0
+    top = max(request.args.get("top", DEFAULT_TOP, type=int), 1)
+    avg_gross, above_30k = payroll_stats()
 
-    return render_template_string(
-        TEMPLATE,
-        table=df.to_html(index=False, classes="table") if not df.empty else "<p>No staff added yet.</p>",
+    ctx = dict(
+        table=payroll_table_html(top),
         avg_gross=avg_gross,
         above_30k=above_30k,
         error=error
     )
+    app.update_template_context(ctx)
+    return _TPL.render(ctx)
+
+@app.route("/add_bulk", methods=["POST"])
+def add_bulk():
+    try:
+        if "file" in request.files:
+            rows = parse_staff_csv(request.files["file"])
+        else:
+            records = request.get_json(silent=True)
+            if not isinstance(records, list):
+                return "Expected a JSON list of staff or a CSV file upload", 400
+            rows = parse_staff(records)
+    except KeyError as e:
+        return f"Missing field: {e.args[0]}", 400
+    except pd.errors.EmptyDataError:
+        return "Uploaded CSV is empty", 400
+    except pd.errors.ParserError:
+        return "Uploaded CSV could not be parsed", 400
+    except InvalidStaff as e:
+        return str(e), 400
+    except (ValueError, TypeError):
+        return "Salary fields must be valid numbers.", 400
+
+    if not rows:
+        return "No staff to add", 400
+
+    insert_staff(rows)
+    return jsonify(inserted=len(rows)), 201
+
+def _write_xlsx(path, headers, rows):
+    # Rows go straight from the SQLite cursor into xlsxwriter; constant_memory
+    # mode flushes each row to disk, so no DataFrame or workbook is held in memory.
+    workbook = xlsxwriter.Workbook(path, {"constant_memory": True})
+    ws = workbook.add_worksheet()
+    ws.write_row(0, 0, headers)
+    for i, row in enumerate(rows, 1):
+        ws.write_row(i, 0, row)
+    workbook.close()
+
+def _write_csv(path, headers, rows):
+    with open(path, "w", newline="", encoding="utf-8") as fh:
+        writer = csv.writer(fh)
+        writer.writerow(headers)
+        writer.writerows(rows)
+
+def _export_path(base, version):
+    root, ext = os.path.splitext(base)
+    return f"{root}.{version}{ext}"
+
+def _remove_stale_exports(base, keep):
+    root, ext = os.path.splitext(base)
+    for path in glob.glob(f"{glob.escape(root)}.*{ext}"):
+        if path != keep:
+            try:
+                os.remove(path)
+            except OSError:  # already removed by another worker, or open on Windows
+                pass
+
+def _open_export(base, write):
+    # Export files are named by staff version, so a file's contents always match
+    # its name whichever worker wrote it and whenever. The response is served
+    # from an open handle, so a concurrent sweep of stale versions cannot pull
+    # the file from under it. Returns (version, open file), or (version, None)
+    # if there are no rows.
+    version = staff_version()
+    try:
+        return version, open(_export_path(base, version), "rb")
+    except FileNotFoundError:
+        pass
+
+    conn = get_db()
+    conn.execute("BEGIN")
+    try:
+        version = staff_version(conn)
+        cur = conn.execute(PAYROLL_SQL)
+        first = cur.fetchone()
+        if first is None:
+            return version, None
+
+        path = _export_path(base, version)
+        fd, tmp = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".tmp")
+        os.close(fd)
+        fh = None
+        try:
+            write(tmp, [col[0] for col in cur.description], itertools.chain([first], cur))
+            if os.name == "nt":  # open files cannot be renamed there
+                os.replace(tmp, path)
+                fh = open(path, "rb")
+            else:
+                # Opened before the rename: the handle stays valid even if another
+                # worker's sweep removes the file once it has a newer version.
+                fh = open(tmp, "rb")
+                os.replace(tmp, path)
+        except BaseException:
+            if fh is not None:
+                fh.close()
+            if os.path.exists(tmp):
+                os.remove(tmp)
+            raise
+    finally:
+        conn.commit()
+
+    _remove_stale_exports(base, path)
+    return version, fh
+
+def _send_export(base, write):
+    version, fh = _open_export(base, write)
+    if fh is None:
+        return "No data to export", 400
+
+    st = os.fstat(fh.fileno())
+    response = send_file(fh, as_attachment=True, download_name=os.path.basename(base),
+                         etag=version, last_modified=st.st_mtime)
+    # send_file cannot size an open file, so the conditional handling is applied
+    # here: If-None-Match / If-Modified-Since get a 304 and Range requests a 206.
+    try:
+        return response.make_conditional(request, accept_ranges=True, complete_length=st.st_size)
+    except RequestedRangeNotSatisfiable:
+        fh.close()
+        raise
 
 @app.route("/export")
 def export():
-    df = compute_payroll()
-    if df.empty:
-        return "No data to export", 400
+    return _send_export(EXPORT_XLSX_BASE, _write_xlsx)
 
-    df.to_excel(EXPORT_FILE, index=False)
-    return send_file(EXPORT_FILE, as_attachment=True)
+@app.route("/export.csv")
+def export_csv():
+    return _send_export(EXPORT_CSV_BASE, _write_csv)
 
-# ---------------- INLINE HTML + CSS + JS ----------------
+# ---------------- INLINE HTML (CSS + JS live in static/) ----------------
 TEMPLATE = """
 <!DOCTYPE html>
 <html>
@@ -103,111 +553,7 @@ TEMPLATE = """
 
 <script src="https://js.puter.com/v2/"></script>
 
-<style>
-* { box-sizing: border-box; }
-
-body {
-  font-family: Inter, system-ui, Arial;
-  background: #f4f6f9;
-  padding: 40px;
-}
-
-.container {
-  background: #fff;
-  max-width: 1100px;
-  margin: auto;
-  padding: 30px;
-  border-radius: 12px;
-  box-shadow: 0 15px 40px rgba(0,0,0,0.08);
-}
-
-h2, h3 { margin-bottom: 10px; }
-
-form {
-  display: grid;
-  grid-template-columns: repeat(auto-fit, minmax(180px, 1fr));
-  gap: 12px;
-  margin-bottom: 20px;
-}
-
-input {
-  padding: 10px;
-  border-radius: 8px;
-  border: 1px solid #ccc;
-}
-
-input:focus {
-  outline: none;
-  border-color: #4f46e5;
-}
-
-button {
-  padding: 12px;
-  border-radius: 8px;
-  border: none;
-  background: #4f46e5;
-  color: white;
-  font-weight: 600;
-  cursor: pointer;
-}
-
-button:hover {
-  background: #4338ca;
-}
-
-.table {
-  width: 100%;
-  border-collapse: collapse;
-  margin-top: 20px;
-}
-
-.table th {
-  background: #4f46e5;
-  color: white;
-  padding: 10px;
-}
-
-.table td {
-  padding: 10px;
-  border-bottom: 1px solid #eee;
-}
-
-.stats {
-  display: flex;
-  gap: 20px;
-  margin-top: 20px;
-}
-
-.stat-box {
-  background: #f8fafc;
-  padding: 15px;
-  border-radius: 10px;
-  flex: 1;
-  border-left: 4px solid #4f46e5;
-}
-
-.error {
-  background: #fee2e2;
-  color: #991b1b;
-  padding: 10px;
-  border-radius: 8px;
-}
-
-a {
-  display: inline-block;
-  margin-top: 15px;
-  font-weight: 600;
-  color: #4f46e5;
-  text-decoration: none;
-}
-
-pre {
-  background: #0f172a;
-  color: #e5e7eb;
-  padding: 15px;
-  border-radius: 10px;
-}
-</style>
+<link rel="stylesheet" href="{{ static_url('payroll.css') }}">
 </head>
 
 <body>
@@ -229,7 +575,7 @@ pre {
   <button>Add Staff</button>
 </form>
 
-{{ table | safe }}
+{{ table }}
 
 <div class="stats">
   <div class="stat-box"><b>Average Gross:</b><br> ₦{{ avg_gross }}</div>
@@ -237,31 +583,21 @@ pre {
 </div>
 
 <a href="/export">📥 Export to Excel</a>
+<a href="/export.csv">📄 Export to CSV</a>
 
 <hr>
 
 <h3>AI Payroll Explanation</h3>
-<button onclick="explain()">Explain Payroll</button>
+<button data-action="explain">Explain Payroll</button>
 <pre id="ai"></pre>
 
 </div>
 
-<script>
-function explain(){
-  puter.ai.chat(
-    "Explain gross pay, tax deduction, pension, and net salary in simple terms.",
-    { model: "gpt-4o-mini" }
-  ).then(r => {
-    document.getElementById("ai").innerText = r.message.content;
-  });
-}
-</script>
+<script src="{{ static_url('payroll.js') }}"></script>
 
 </body>
 </html>
 """
 
-# ---------------- MAIN ----------------
-if __name__ == "__main__":
-    init_db()
-    app.run(host="0.0.0.0", port=5000)
+# Parsed once at import; requests only pay for rendering.
+_TPL = app.jinja_env.from_string(TEMPLATE)
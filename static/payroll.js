@@ -0,0 +1,58 @@
+const EXPLAIN_PROMPT = "Explain gross pay, tax deduction, pension, and net salary in simple terms.";
+let explaining = null;
+
+async function explainCacheKey(){
+  // crypto.subtle is only available in secure contexts (https / localhost).
+  if (!window.crypto || !crypto.subtle) return null;
+  const table = document.querySelector(".table")?.innerText || "";
+  const digest = await crypto.subtle.digest("SHA-256", new TextEncoder().encode(EXPLAIN_PROMPT + "\n" + table));
+  return "ai:" + Array.from(new Uint8Array(digest), b => b.toString(16).padStart(2, "0")).join("");
+}
+
+// Even touching localStorage throws when storage is blocked (cookies disabled,
+// some privacy modes); the cache is then simply skipped.
+function cacheGet(key){
+  try {
+    return key ? localStorage.getItem(key) : null;
+  } catch (err) {
+    return null;
+  }
+}
+
+function cacheSet(key, value){
+  if (!key) return;
+  try {
+    // Keep only the entry for the current table; older ones would never be
+    // read again and would pile up until the quota is hit.
+    for (let i = localStorage.length - 1; i >= 0; i--) {
+      const k = localStorage.key(i);
+      if (k && k.startsWith("ai:") && k !== key) localStorage.removeItem(k);
+    }
+    localStorage.setItem(key, value);
+  } catch (err) {
+    // storage blocked or full; the answer is still shown
+  }
+}
+
+async function explain(){
+  const out = document.getElementById("ai");
+  const key = await explainCacheKey();
+  const cached = cacheGet(key);
+  if (cached) {
+    out.innerText = cached;
+    return;
+  }
+
+  try {
+    const r = await puter.ai.chat(EXPLAIN_PROMPT, { model: "gpt-4o-mini" });
+    out.innerText = r.message.content;
+    cacheSet(key, r.message.content);
+  } catch (err) {
+    out.innerText = "Could not get an explanation: " + (err?.message || err);
+  }
+}
+
+document.addEventListener("click", e => {
+  if (!e.target.closest("[data-action='explain']") || explaining) return;
+  explaining = explain().finally(() => { explaining = null; });
+});
@@ -0,0 +1,5 @@
+from run import app, init_db
+
+# ---------------- WSGI ENTRY ----------------
+# gunicorn -k gevent -w 4 wsgi:app
+init_db()